@@ -4,219 +4,31 @@ Claude API Demo Script
 
 This script demonstrates various features of the Anthropic Claude API
 for AI-powered coding assistance.
+
+Run with --batch to send the single-shot demos through the Message Batches
+API instead (slower to come back, but one request and half the token cost;
+the multi-turn demo still runs as usual alongside the batch), and with
+--check-cli to also check whether the Claude CLI is installed.
 """
 
 import asyncio
-import os
 import sys
-from dotenv import load_dotenv
-
-# Install required packages if missing
-def install_requirements():
-    """Install required packages if not available"""
-    try:
-        import anthropic
-        print("✓ Anthropic SDK available")
-    except ImportError:
-        print("Installing Anthropic SDK...")
-        import subprocess
-        subprocess.check_call([sys.executable, '-m', 'pip', 'install', 'anthropic'])
-        print("✓ Anthropic SDK installed")
-
-def setup_api_key():
-    """Setup API key from environment or .env file"""
-    # Load from .env file
-    # load_dotenv(dotenv_path='ib_invoice_ops/.env')
-    load_dotenv(dotenv_path='.env')
-    api_key = os.getenv('ANTHROPIC_API_KEY')
-    
-    if api_key:
-        os.environ["ANTHROPIC_API_KEY"] = api_key
-        print("✓ API key configured from .env file")
-        return True
-    else:
-        print("❌ No API key found in .env file")
-        print("Please set ANTHROPIC_API_KEY in ib_invoice_ops/.env")
-        return False
-
-async def demo_hello_world():
-    """Demo 1: Simple Hello World"""
-    print("\n=== Demo 1: Hello World ===")
-    
-    import anthropic
-    
-    try:
-        client = anthropic.AsyncAnthropic()
-        response = await client.messages.create(
-            model="claude-3-5-sonnet-20241022",
-            max_tokens=1000,
-            messages=[{
-                "role": "user", 
-                "content": "Say hello and briefly introduce yourself as Claude"
-            }]
-        )
-        print(f"Claude: {response.content[0].text}")
-    except Exception as e:
-        print(f"❌ Error: {e}")
-        return False
-    return True
-
-async def demo_code_generation():
-    """Demo 2: Code Generation"""
-    print("\n=== Demo 2: Code Generation ===")
-    
-    import anthropic
-    
-    try:
-        client = anthropic.AsyncAnthropic()
-        response = await client.messages.create(
-            model="claude-3-5-sonnet-20241022",
-            max_tokens=1000,
-            messages=[{
-                "role": "user",
-                "content": "Write a Python function to reverse a string with error handling"
-            }]
-        )
-        print("Generated Code:")
-        print(response.content[0].text)
-        return True
-    except Exception as e:
-        print(f"❌ Error: {e}")
-        return False
-
-async def demo_code_review():
-    """Demo 3: Code Review"""
-    print("\n=== Demo 3: Code Review ===")
-    
-    sample_code = '''
-def process_data(data):
-    result = []
-    for i in range(len(data)):
-        if data[i] > 0:
-            result.append(data[i] * 2)
-    return result
-'''
-    
-    import anthropic
-    
-    try:
-        client = anthropic.AsyncAnthropic()
-        prompt = f"Review this Python code and suggest improvements:\n\n{sample_code}"
-        response = await client.messages.create(
-            model="claude-3-5-sonnet-20241022",
-            max_tokens=1000,
-            messages=[{
-                "role": "user",
-                "content": prompt
-            }]
-        )
-        print("Code Review:")
-        print(response.content[0].text)
-        return True
-    except Exception as e:
-        print(f"❌ Error: {e}")
-        return False
-
-async def demo_debugging_help():
-    """Demo 4: Debugging Help"""
-    print("\n=== Demo 4: Debugging Help ===")
-    
-    error_code = '''
-def divide_numbers(a, b):
-    return a / b
-
-# This causes an error
-result = divide_numbers(10, 0)
-print(result)
-'''
-    
-    import anthropic
-    
-    try:
-        client = anthropic.AsyncAnthropic()
-        prompt = f"This code has a bug. Explain the issue and provide a fix:\n\n{error_code}"
-        response = await client.messages.create(
-            model="claude-3-5-sonnet-20241022",
-            max_tokens=1000,
-            messages=[{
-                "role": "user",
-                "content": prompt
-            }]
-        )
-        print("Debugging Help:")
-        print(response.content[0].text)
-        return True
-    except Exception as e:
-        print(f"❌ Error: {e}")
-        return False
-
-async def demo_multi_turn():
-    """Demo 5: Multi-turn Conversation"""
-    print("\n=== Demo 5: Multi-turn Conversation ===")
-    
-    import anthropic
-    
-    try:
-        client = anthropic.AsyncAnthropic()
-        
-        # First turn
-        response1 = await client.messages.create(
-            model="claude-3-5-sonnet-20241022",
-            max_tokens=1000,
-            messages=[{
-                "role": "user",
-                "content": "Help me design a simple calculator class. Start with the basic structure."
-            }]
-        )
-        
-        print("\nTurn 1:")
-        turn1_content = response1.content[0].text
-        print(turn1_content[:300] + "..." if len(turn1_content) > 300 else turn1_content)
-        
-        # Second turn
-        response2 = await client.messages.create(
-            model="claude-3-5-sonnet-20241022",
-            max_tokens=1000,
-            messages=[
-                {"role": "user", "content": "Help me design a simple calculator class. Start with the basic structure."},
-                {"role": "assistant", "content": turn1_content},
-                {"role": "user", "content": "Now add methods for basic arithmetic operations."}
-            ]
-        )
-        
-        print("\nTurn 2:")
-        turn2_content = response2.content[0].text
-        print(turn2_content[:300] + "..." if len(turn2_content) > 300 else turn2_content)
-        
-        print("\nCompleted 2 turns")
-        return True
-    except Exception as e:
-        print(f"❌ Error: {e}")
-        return False
 
-async def demo_error_handling():
-    """Demo 6: Error Handling Best Practices"""
-    print("\n=== Demo 6: Error Handling ===")
-    
-    import anthropic
-    
-    try:
-        client = anthropic.AsyncAnthropic()
-        response = await client.messages.create(
-            model="claude-3-5-sonnet-20241022",
-            max_tokens=1000,
-            messages=[{
-                "role": "user",
-                "content": "Write a brief guide on Python error handling"
-            }]
-        )
-        print("Success!")
-        content = response.content[0].text
-        print(content[:200] + "...")
-        return True
-    except Exception as e:
-        print(f"✓ Error handled: {type(e).__name__}: {e}")
-        return False
+from demos import (
+    create_client,
+    demo_code_generation,
+    demo_code_review,
+    demo_concurrency,
+    demo_debugging_help,
+    demo_error_handling,
+    demo_hello_world,
+    demo_multi_turn,
+    install_requirements,
+    run_batch_demos,
+    run_demos,
+    run_main,
+    setup_api_key,
+)
 
 def check_claude_cli():
     """Check if Claude CLI is installed (optional for this demo)"""
@@ -234,8 +46,16 @@ def check_claude_cli():
         print("Install with: npm install -g @anthropic-ai/claude-code")
         return True  # Not required for this demo
 
+async def run_batch(client):
+    """Run the batchable demos as one Message Batch and return how many succeeded"""
+    try:
+        return await run_batch_demos(client)
+    except Exception as e:
+        print(f"❌ Batch failed: {e}")
+        return 0
+
 async def run_all_demos():
-    """Run all demos in sequence"""
+    """Run all demos concurrently"""
     print("Claude API Demo Starting...")
     print("=" * 50)
     
@@ -243,8 +63,13 @@ async def run_all_demos():
     install_requirements()
     if not setup_api_key():
         return
+    # Checked before any request goes out, once .env has been loaded
+    concurrency = demo_concurrency()
+    if concurrency is None:
+        return
     
-    check_claude_cli()  # Optional check
+    if "--check-cli" in sys.argv:
+        check_claude_cli()  # Optional, spawns a `claude` subprocess
     
     # Run demos with better error handling
     demos = [
@@ -256,26 +81,24 @@ async def run_all_demos():
         ("Error Handling", demo_error_handling)
     ]
     
-    successful = 0
-    for name, demo_func in demos:
-        try:
-            result = await demo_func()
-            if result:
-                successful += 1
-        except Exception as e:
-            print(f"❌ {name} demo failed: {e}")
+    async with create_client() as client:
+        if "--batch" in sys.argv:
+            # Not latency sensitive: one request for every single-shot prompt,
+            # while the multi-turn demo, which can't be batched, runs as usual
+            batched, streamed = await asyncio.gather(
+                run_batch(client),
+                run_demos(client, [("Multi-turn", demo_multi_turn)], concurrency)
+            )
+            successful = batched + streamed
+        else:
+            successful = await run_demos(client, demos, concurrency)
     
     print("\n" + "=" * 50)
     print(f"Completed {successful}/{len(demos)} demos successfully!")
 
 def main():
     """Main entry point"""
-    try:
-        asyncio.run(run_all_demos())
-    except KeyboardInterrupt:
-        print("\n\nDemo interrupted by user")
-    except Exception as e:
-        print(f"\nDemo failed: {e}")
+    run_main(run_all_demos)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
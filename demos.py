@@ -0,0 +1,531 @@
+"""
+Shared Claude API demos
+
+The demos, prompts and helpers used by claudeCodeDemo.py and
+simpleClaudeDemo.py. Each demo is an async function that takes the shared
+AsyncAnthropic client and returns True on success; each script picks the
+demos it runs.
+"""
+
+import asyncio
+import contextlib
+import contextvars
+import importlib.util
+import os
+import re
+import sys
+import time
+from difflib import SequenceMatcher
+
+try:
+    import anthropic
+    import httpx
+except ImportError:
+    # Installed on demand by install_requirements()
+    anthropic = httpx = None
+
+def env_flag(name):
+    """Whether an on/off environment variable is switched on (1/true/yes/on)"""
+    return os.getenv(name, "").strip().lower() in ("1", "true", "yes", "on")
+
+MODEL = "claude-3-5-sonnet-20241022"
+# Fixed parameters shared by every request, built once and spread into each
+# call; upgrading the model only means changing MODEL
+BASE_PARAMS = {"model": MODEL, "max_tokens": 1000}
+# Smaller budgets for demos whose output is short or gets truncated anyway;
+# generation time grows with the number of tokens produced
+MAX_TOKENS_SHORT = 256
+MAX_TOKENS_MED = 512
+
+SAMPLE_CODE = '''
+def process_data(data):
+    result = []
+    for i in range(len(data)):
+        if data[i] > 0:
+            result.append(data[i] * 2)
+    return result
+'''
+# The improvement the review should land on: a vectorized NumPy version,
+# written by hand as a canned answer (nothing runs it against SAMPLE_CODE).
+# With OFFLINE=1 the code review demo prints this instead of calling the
+# API. Only that one call is replaced: the other demos and --batch still
+# call the API, so an API key is still required.
+IMPROVED_SAMPLE = '''
+import numpy as np
+
+def process_data(data):
+    a = np.asarray(data)
+    return (a[a > 0] * 2).tolist()
+'''
+
+ERROR_CODE = '''
+def divide_numbers(a, b):
+    return a / b
+
+# This causes an error
+result = divide_numbers(10, 0)
+print(result)
+'''
+
+# Marks the end of a prompt prefix the API may cache and reuse across calls.
+# Prefixes shorter than the model's minimum (1024 tokens for Sonnet) are
+# simply not cached, so this only pays off as the snippets grow.
+CACHE_CONTROL = {"type": "ephemeral"}
+
+# Request messages are built once here and reused on every call
+HELLO_MESSAGES = [{
+    "role": "user",
+    "content": "Say hello and briefly introduce yourself as Claude"
+}]
+CODE_GEN_MESSAGES = [{
+    "role": "user",
+    "content": "Write a Python function to reverse a string with error handling"
+}]
+CODE_REVIEW_MESSAGES = [{
+    "role": "user",
+    "content": [{
+        "type": "text",
+        "text": f"Review this Python code and suggest improvements:\n\n{SAMPLE_CODE}",
+        "cache_control": CACHE_CONTROL
+    }]
+}]
+DEBUGGING_MESSAGES = [{
+    "role": "user",
+    "content": [{
+        "type": "text",
+        "text": f"This code has a bug. Explain the issue and provide a fix:\n\n{ERROR_CODE}",
+        "cache_control": CACHE_CONTROL
+    }]
+}]
+MULTI_TURN_MESSAGES = [{
+    "role": "user",
+    "content": [{
+        "type": "text",
+        "text": "Help me design a simple calculator class. Start with the basic structure.",
+        "cache_control": CACHE_CONTROL
+    }]
+}]
+MULTI_TURN_FOLLOW_UP = {
+    "role": "user",
+    "content": "Now add methods for basic arithmetic operations."
+}
+ERROR_HANDLING_MESSAGES = [{
+    "role": "user",
+    "content": "Write a brief guide on Python error handling"
+}]
+# A typical turn-1 answer. With SPECULATE_TURN2=1, turn 2 is requested against
+# it speculatively while the real turn 1 is still streaming, and that answer is
+# kept if the real turn 1 opens at least SPECULATION_THRESHOLD similar to this
+# one. Only the opening (the first len(CANNED_TURN1) characters) is compared: a
+# full 512-token reply is several times longer, so a whole-text ratio could
+# never reach the threshold.
+CANNED_TURN1 = '''Here's a basic structure for a simple calculator class:
+
+```python
+class Calculator:
+    """A simple calculator."""
+
+    def __init__(self):
+        self.result = 0
+
+    def clear(self):
+        """Reset the calculator."""
+        self.result = 0
+```
+
+This gives us a starting point: a `result` attribute to hold the current value and a `clear` method to reset it. We can add the arithmetic operations next.'''
+SPECULATION_THRESHOLD = 0.8
+
+# Seconds between status checks while a message batch is processing, how
+# many checks between progress lines, and how long to wait before giving up
+BATCH_POLL_SECONDS = 10
+BATCH_PROGRESS_EVERY = 6
+BATCH_TIMEOUT_SECONDS = 30 * 60
+
+# Install required packages if missing
+def install_requirements():
+    """Install required packages if not available (opt-in via AGENTS_AUTO_INSTALL)"""
+    global anthropic, httpx
+    if anthropic is not None:
+        return
+    if not env_flag("AGENTS_AUTO_INSTALL"):
+        raise SystemExit(
+            "❌ Anthropic SDK not found. Install it with:\n"
+            "    pip install anthropic 'httpx[http2]'\n"
+            "or set AGENTS_AUTO_INSTALL=1 to install it automatically"
+        )
+    print("Installing Anthropic SDK...")
+    import subprocess
+    subprocess.check_call([sys.executable, '-m', 'pip', 'install', 'anthropic', 'httpx[http2]'])
+    import anthropic
+    import httpx
+    print("✓ Anthropic SDK installed")
+
+def load_env(path='.env'):
+    """Load KEY=value lines from a .env file into the environment"""
+    # Values already set in the environment win, like python-dotenv's default
+    try:
+        with open(path) as f:
+            for line in f:
+                line = line.strip()
+                if line.startswith("export "):
+                    line = line[len("export "):]
+                if not line or line.startswith("#") or "=" not in line:
+                    continue
+                key, _, value = line.partition("=")
+                value = value.strip()
+                end = value.find(value[0], 1) if value[:1] in ("'", '"') else -1
+                if end > 0:
+                    # Quoted: keep everything between the matching pair
+                    value = value[1:end]
+                else:
+                    # Unquoted: a " #" starts a trailing comment
+                    value = re.split(r"\s#", value, maxsplit=1)[0].rstrip()
+                os.environ.setdefault(key.strip(), value)
+    except FileNotFoundError:
+        pass
+
+def setup_api_key():
+    """Setup API key from environment or .env file"""
+    # Read .env even when the shell already exported the key, since it can
+    # hold other settings too (OFFLINE, DEMO_CONCURRENCY)
+    exported = bool(os.getenv("ANTHROPIC_API_KEY"))
+    load_env('.env')
+    if exported:
+        print("✓ API key configured from environment")
+        return True
+    
+    api_key = os.getenv('ANTHROPIC_API_KEY')
+    
+    if api_key:
+        os.environ["ANTHROPIC_API_KEY"] = api_key
+        print("✓ API key configured from .env file")
+        return True
+    else:
+        print("❌ No API key found in .env file")
+        print("Please set ANTHROPIC_API_KEY in .env")
+        return False
+
+# Demos run concurrently, so only one of them writes to the terminal at a time
+console_lock = asyncio.Lock()
+# Set by run_demos to the Event of the demo listed before the current one,
+# so demos print in list order rather than in the order they finish
+previous_demo_done = contextvars.ContextVar("previous_demo_done", default=None)
+# Streamed text is collected and written to the terminal every this many
+# chunks, rather than on every token
+FLUSH_EVERY = 32
+
+@contextlib.asynccontextmanager
+async def console():
+    """Hold the terminal once the previous demo, if any, has finished printing"""
+    previous = previous_demo_done.get()
+    if previous is not None:
+        await previous.wait()
+    async with console_lock:
+        yield
+
+def request_params(messages, max_tokens=None):
+    """BASE_PARAMS plus a request's messages and, optionally, its own token budget"""
+    params = {**BASE_PARAMS, "messages": messages}
+    if max_tokens:
+        params["max_tokens"] = max_tokens
+    return params
+
+def heading(title, label):
+    """The "=== title ===" line plus a reply's label; a title of None continues
+    the current demo (e.g. its next turn) under just the label"""
+    return f"\n=== {title} ===\n{label}" if title else label
+
+async def stream_reply(client, title, label, limit=None, **params):
+    """Stream Claude's reply to the terminal as it arrives and return its text,
+    or print the error and return None if the request fails"""
+    started = False
+    try:
+        async with client.messages.stream(**params) as stream:
+            # The stream is already open while we wait for the console, so a
+            # queued demo starts printing as soon as the previous one is done
+            async with console():
+                print(heading(title, label), end="", flush=True)
+                started = True
+                printed = 0
+                pending = []
+                try:
+                    async for text in stream.text_stream:
+                        if limit is not None:
+                            text = text[:limit - printed]
+                        pending.append(text)
+                        printed += len(text)
+                        if len(pending) == FLUSH_EVERY:
+                            sys.stdout.write("".join(pending))
+                            sys.stdout.flush()
+                            pending.clear()
+                    message = await stream.get_final_message()
+                finally:
+                    # Show whatever arrived, even if the stream broke off
+                    sys.stdout.write("".join(pending))
+                content = message.content[0].text
+                print("..." if limit is not None and len(content) > limit else "", flush=True)
+        return content
+    except Exception as e:
+        # Once the heading is out, report the error under it instead of
+        # starting the demo's output over
+        if started:
+            title, label = None, "\n"
+        else:
+            label = ""
+        await print_reply(title, label, f"❌ Error: {type(e).__name__}: {e}")
+        return None
+
+async def print_reply(title, label, content, limit=None):
+    """Print a complete reply the same way stream_reply lays it out"""
+    if limit is not None and len(content) > limit:
+        content = content[:limit] + "..."
+    async with console():
+        print(f"{heading(title, label)}{content}", flush=True)
+
+async def fetch_reply(client, messages, max_tokens=None):
+    """Get a reply's text without printing anything"""
+    message = await client.messages.create(**request_params(messages, max_tokens))
+    return message.content[0].text
+
+async def ask_claude(client, title, label, messages, limit=None, max_tokens=None):
+    """Stream a reply under the demo's heading; return its text, or None on failure"""
+    return await stream_reply(client, title, label, limit, **request_params(messages, max_tokens))
+
+async def demo_hello_world(client):
+    """Demo 1: Simple Hello World"""
+    reply = await ask_claude(client, "Demo 1: Hello World", "Claude: ", HELLO_MESSAGES,
+                             max_tokens=MAX_TOKENS_SHORT)
+    return reply is not None
+
+async def demo_code_generation(client):
+    """Demo 2: Code Generation"""
+    reply = await ask_claude(client, "Demo 2: Code Generation", "Generated Code:\n", CODE_GEN_MESSAGES)
+    return reply is not None
+
+async def demo_code_review(client):
+    """Demo 3: Code Review"""
+    # Read here rather than at import, so OFFLINE=1 in .env counts too
+    if env_flag("OFFLINE"):
+        await print_reply("Demo 3: Code Review", "Code Review (offline):", IMPROVED_SAMPLE.rstrip())
+        return True
+    reply = await ask_claude(client, "Demo 3: Code Review", "Code Review:\n", CODE_REVIEW_MESSAGES,
+                             max_tokens=MAX_TOKENS_MED)
+    return reply is not None
+
+async def demo_debugging_help(client):
+    """Demo 4: Debugging Help"""
+    reply = await ask_claude(client, "Demo 4: Debugging Help", "Debugging Help:\n", DEBUGGING_MESSAGES,
+                             max_tokens=MAX_TOKENS_MED)
+    return reply is not None
+
+def multi_turn_messages(turn1_content):
+    """Build the turn-2 conversation on top of a turn-1 answer"""
+    # Turn 2 resends turn 1 verbatim, so mark it cacheable too
+    return [
+        *MULTI_TURN_MESSAGES,
+        {
+            "role": "assistant",
+            "content": [{"type": "text", "text": turn1_content, "cache_control": CACHE_CONTROL}]
+        },
+        MULTI_TURN_FOLLOW_UP
+    ]
+
+async def discard(task):
+    """Cancel a task we no longer need and swallow whatever it ended with"""
+    task.cancel()
+    # Retrieve the outcome so a task that already failed isn't reported as
+    # "Task exception was never retrieved"
+    await asyncio.gather(task, return_exceptions=True)
+
+async def speculative_turn2(speculative, turn1_content):
+    """The speculative turn 2 if the real turn 1 matches CANNED_TURN1, else None"""
+    opening = turn1_content[:len(CANNED_TURN1)]
+    if SequenceMatcher(None, opening, CANNED_TURN1).ratio() >= SPECULATION_THRESHOLD:
+        try:
+            return await speculative
+        except Exception:
+            return None  # Fall back to asking for turn 2 for real
+    await discard(speculative)
+    return None
+
+async def demo_multi_turn(client):
+    """Demo 5: Multi-turn Conversation"""
+    title = "Demo 5: Multi-turn Conversation"
+    
+    # Turn 2 depends on turn 1. SPECULATE_TURN2=1 starts it against a canned
+    # turn 1 in parallel instead, kept only if the real one opens much the
+    # same. It is off by default: real answers rarely come that close, so it
+    # mostly pays for an extra request, and a kept turn 2 answers the canned
+    # turn 1 rather than the one printed above it
+    speculative = None
+    if env_flag("SPECULATE_TURN2"):
+        speculative = asyncio.create_task(
+            fetch_reply(client, multi_turn_messages(CANNED_TURN1), MAX_TOKENS_SHORT)
+        )
+    
+    # Turn 1 keeps a bigger budget than we print, since turn 2 builds on it
+    turn1_content = await ask_claude(client, title, "\nTurn 1:\n", MULTI_TURN_MESSAGES,
+                                     limit=300, max_tokens=MAX_TOKENS_MED)
+    if turn1_content is None:
+        if speculative is not None:
+            await discard(speculative)
+        return False
+    
+    if speculative is not None:
+        turn2_content = await speculative_turn2(speculative, turn1_content)
+        if turn2_content is not None:
+            await print_reply(None, "\nTurn 2:\n", turn2_content, limit=300)
+            await print_reply(None, "", "\nCompleted 2 turns")
+            return True
+    
+    reply = await ask_claude(client, None, "\nTurn 2:\n", multi_turn_messages(turn1_content),
+                             limit=300, max_tokens=MAX_TOKENS_SHORT)
+    if reply is None:
+        return False
+    await print_reply(None, "", "\nCompleted 2 turns")
+    return True
+
+async def demo_error_handling(client):
+    """Demo 6: Error Handling Best Practices"""
+    # Not streamed: "Success!" is only true once the whole reply is in, and
+    # a failure is this demo's own outcome to report
+    title = "Demo 6: Error Handling"
+    try:
+        content = await fetch_reply(client, ERROR_HANDLING_MESSAGES, MAX_TOKENS_SHORT)
+    except Exception as e:
+        await print_reply(title, "", f"✓ Error handled: {type(e).__name__}: {e}")
+        return False
+    await print_reply(title, "Success!\n", content, limit=200)
+    return True
+
+# Demos with a single, independent prompt can be batched; the multi-turn demo
+# can't, since its second turn needs the first reply.
+# custom_id -> (title, label, messages, truncation limit, max_tokens)
+BATCH_DEMOS = {
+    "hello": ("Demo 1: Hello World", "Claude: ", HELLO_MESSAGES, None, MAX_TOKENS_SHORT),
+    "code_gen": ("Demo 2: Code Generation", "Generated Code:\n", CODE_GEN_MESSAGES, None, None),
+    "code_review": ("Demo 3: Code Review", "Code Review:\n", CODE_REVIEW_MESSAGES, None, MAX_TOKENS_MED),
+    "debugging": ("Demo 4: Debugging Help", "Debugging Help:\n", DEBUGGING_MESSAGES, None, MAX_TOKENS_MED),
+    "error_handling": ("Demo 6: Error Handling", "Success!\n", ERROR_HANDLING_MESSAGES, 200, MAX_TOKENS_SHORT)
+}
+
+async def run_batch_demos(client):
+    """Run the single-shot demos as one Message Batch and print the results"""
+    batch = await client.messages.batches.create(requests=[
+        {
+            "custom_id": custom_id,
+            "params": request_params(messages, max_tokens)
+        }
+        for custom_id, (_, _, messages, _, max_tokens) in BATCH_DEMOS.items()
+    ])
+    print(f"\nSubmitted batch {batch.id}, waiting for results...", flush=True)
+    
+    deadline = time.monotonic() + BATCH_TIMEOUT_SECONDS
+    polls = 0
+    while batch.processing_status != "ended":
+        if time.monotonic() >= deadline:
+            raise TimeoutError(
+                f"batch {batch.id} still {batch.processing_status} after "
+                f"{BATCH_TIMEOUT_SECONDS}s; fetch its results later from the console"
+            )
+        await asyncio.sleep(BATCH_POLL_SECONDS)
+        batch = await client.messages.batches.retrieve(batch.id)
+        polls += 1
+        if polls % BATCH_PROGRESS_EVERY == 0:
+            counts = batch.request_counts
+            print(f"  ...{counts.processing} processing, {counts.succeeded} succeeded, "
+                  f"{counts.errored} errored", flush=True)
+    
+    # Results come back in any order, so collect them and print in demo order
+    results = {}
+    async for entry in await client.messages.batches.results(batch.id):
+        results[entry.custom_id] = entry.result
+    
+    successful = 0
+    for custom_id, (title, label, _, limit, _) in BATCH_DEMOS.items():
+        result = results.get(custom_id)
+        if result is None or result.type != "succeeded":
+            status = result.type if result else "missing"
+            print(f"\n=== {title} ===\n❌ Error: batch request {status}", flush=True)
+            continue
+        await print_reply(title, label, result.message.content[0].text, limit)
+        successful += 1
+    return successful
+
+def create_client():
+    """Create the AsyncAnthropic client shared by every demo"""
+    # They all share one client, and HTTP/2 lets the in-flight requests
+    # multiplex over a single connection rather than each doing its own
+    # TCP + TLS handshake. httpx needs the h2 package for that, so fall
+    # back to HTTP/1.1 in an environment that installed plain httpx
+    http_client = anthropic.DefaultAsyncHttpxClient(
+        http2=importlib.util.find_spec("h2") is not None,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=100)
+    )
+    return anthropic.AsyncAnthropic(http_client=http_client)
+
+def demo_concurrency():
+    """Read DEMO_CONCURRENCY, the number of demos allowed to run at once; None if invalid"""
+    value = os.getenv("DEMO_CONCURRENCY", "8")
+    try:
+        return max(1, int(value))
+    except ValueError:
+        print(f"❌ DEMO_CONCURRENCY must be a whole number, got {value!r}")
+        return None
+
+async def run_demos(client, demos, concurrency):
+    """Run (name, demo_func) pairs concurrently and return how many succeeded"""
+    # Open the connection up front (count_tokens is free) so the demos
+    # below all start on a warm connection instead of queueing behind
+    # the first one's TCP + TLS + HTTP/2 setup
+    try:
+        await client.messages.count_tokens(model=MODEL, messages=HELLO_MESSAGES)
+    except anthropic.APIError:
+        pass  # The demos will report any real problem
+    
+    # The demos are independent, so overlap them instead of paying for
+    # every round-trip one after another. Cap how many run at once, so a
+    # longer demo list queues up instead of exhausting the connection pool.
+    # The cap counts demos, not requests: with SPECULATE_TURN2=1 the
+    # multi-turn demo has two calls in flight at once.
+    semaphore = asyncio.Semaphore(concurrency)
+    # Each demo sets its Event once it has returned, which lets the next
+    # demo in the list take the terminal
+    done = [asyncio.Event() for _ in demos]
+    
+    async def run_demo(index, demo_func):
+        if index:
+            previous_demo_done.set(done[index - 1])
+        try:
+            async with semaphore:
+                return await demo_func(client)
+        finally:
+            done[index].set()
+    
+    tasks = [asyncio.create_task(run_demo(index, demo_func))
+             for index, (_, demo_func) in enumerate(demos)]
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    
+    for (name, _), result in zip(demos, results):
+        if isinstance(result, Exception):
+            print(f"❌ {name} demo failed: {result}")
+    return sum(1 for result in results if result is True)
+
+def run_main(run_all_demos):
+    """Run a script's run_all_demos coroutine function to completion"""
+    # uvloop's libuv-based event loop has less per-await overhead than the
+    # stock one; it isn't available on Windows, so fall back there
+    try:
+        import uvloop
+        loop_factory = uvloop.new_event_loop
+    except ImportError:
+        loop_factory = None
+    
+    try:
+        with asyncio.Runner(loop_factory=loop_factory) as runner:
+            runner.run(run_all_demos())
+    except KeyboardInterrupt:
+        print("\n\nDemo interrupted by user")
+    except Exception as e:
+        print(f"\nDemo failed: {e}")